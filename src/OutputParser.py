@@ -1,10 +1,12 @@
 
 stateListDelimiter = "*** States ***"
 stateDelimiter = "State"
+ioBufferSize = 1 << 20
 
 from State import *
-import re,sys,pdb
-propPattern = re.compile("\(.*\)\Z")
+import re,sys,pdb,string
+_PAREN_TABLE = string.maketrans("(),", "   ")
+_PROP_RE = re.compile("^[^\S\n]*(\S.*)$", re.M)
 
 
 def tryOpen(fname, mode):
@@ -27,12 +29,12 @@ def tryIO(fname, mode, strBufPtr=""):
 
     try:
         if mode == "read":
-            fhandle = open(fname, "r")
-            strBufPtr = fhandle.read()
+            with open(fname, "rb", ioBufferSize) as fhandle:
+                strBufPtr = fhandle.read()
             retVal = strBufPtr
         if mode == "write":
-            fhandle = open(fname, "w")
-            retVal = fhandle.write(strBufPtr)
+            with open(fname, "wb", ioBufferSize) as fhandle:
+                retVal = fhandle.write(strBufPtr)
     except IOError as e:
         print "While working on {0}".format(fname)
         print "Encountered IO Error {0}: {1}".format(e.errno, e.strerror)
@@ -48,9 +50,11 @@ class OutputParser:
         self.fname = fname
         self.stateList = []
         self.propSet = set()
+        self._raw = ""
         print "Setting up o/p parser for {0}.".format(fname)
         if fname != "":
-            self.parseFFOutput("")
+            self._raw = tryIO(fname, "read")
+            self.parseFFOutput(self._raw)
 
 
     def parseFDOutput(self, fdStr, planCount):
@@ -96,58 +100,44 @@ class OutputParser:
         
 
     def parseFFOutput(self, fileStr):
-        ''' returns list of states from fileStr.
+        ''' returns list of states from fileStr, the already-read
+        contents of an FF output file.
         First state in the list is the state before 
         the first action.'''
         print "Planner mode for parsing: FF"
-        if self.fname != "":
-            #f = tryOpen(self.fname, "r")
-            #fstr = f.read()
-            #f.close()
-            
-            fstr = tryIO(self.fname, "read")
-            relevantStr = fstr.split(stateListDelimiter)[1]
-        
-        if fileStr != "":
-            fstr = fileStr
-            relevantStr = fstr
+        start = fileStr.find(stateListDelimiter)
+        if start < 0:
+            print "No state list in FF output. Error"
+            sys.exit(-1)
 
         stateList = []
-        
-        for stateStr in relevantStr.split(stateDelimiter):
-            s = self.getStateFromStr(stateStr)
+        pos = start + len(stateListDelimiter)
+        while True:
+            nxt = fileStr.find(stateDelimiter, pos)
+            end = nxt if nxt >= 0 else len(fileStr)
+            s = self.getStateFromStr(fileStr[pos:end])
             if s.size() >0:
                 stateList.append(s)
+            if nxt < 0:
+                break
+            pos = nxt + len(stateDelimiter)
         self.stateList = stateList
         return stateList
 
 
     def getStateFromStr(self, stateStr):
         s = State()
-        for rawPropositionStr in stateStr.split("\n"):
-            propositionStr = rawPropositionStr.strip().replace(\
-                "(", " ").replace(")", " ").replace(",", " ").lower()
-            propositionStr = "("+propositionStr.strip()+")"
-            if propositionStr != "()":
-                if propPattern.match(propositionStr) != None:
-                    s.addProposition(propositionStr)
-                else:
-                    print "not a proposition: " + propositionStr
+        add = s.addProposition
+        for body in _PROP_RE.findall(stateStr.translate(_PAREN_TABLE).lower()):
+            add("(" + " ".join(body.split()) + ")")
         return s
 
 
     def getPropSet(self):
-        stateProps = self.stateList[0].getAllProps()
-        sProps = stateProps
+        sProps = set()
         for state in self.stateList:
-            prevStateProps = stateProps
-            stateProps = state.getAllProps()
-            diff = prevStateProps^stateProps 
-            # if len(diff) >0:
-            #     print "diffs from previous:"
-            #     print "diff: "+ str(diff)+"\n\n"
-            sProps = sProps|stateProps
-
+            sProps.update(state.getTrueProps())
+            sProps.update(state.getFalseProps())
         return sProps
 
     def getStateByIndex(self, index):
@@ -158,9 +148,7 @@ class OutputParser:
             return -1
 
     def getFFPlan(self):
-        ffstr = tryIO(self.fname, "read")
-
-        ffPlanStr = ffstr.split("found legal plan as follows")[1].\
+        ffPlanStr = self._raw.split("found legal plan as follows")[1].\
             split("time")[0]
         return ffPlanStr.replace("step", "")
 
@@ -1,5 +1,36 @@
 from InitFileMgr import *
-import pdb
+import os, pdb
+
+parserCacheSize = 16
+_parserCache = {}
+
+
+def getFFOutputParser(ffOutputFile):
+    '''returns an OutputParser for ffOutputFile with its propSet filled in.
+    Parsers are reused until the file's mtime or size changes on disk.
+    The raw FF output is dropped, so getFFPlan is not available on them.'''
+    try:
+        st = os.stat(ffOutputFile)
+        stamp = (st.st_mtime, st.st_size)
+    except OSError:
+        stamp = None
+
+    cached = _parserCache.get(ffOutputFile)
+    if stamp is not None and cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    op = OutputParser(ffOutputFile)
+    op.propSet = op.getPropSet()
+    op._raw = ""
+    if stamp is not None:
+        if len(_parserCache) >= parserCacheSize:
+            _parserCache.clear()
+        _parserCache[ffOutputFile] = (stamp, op)
+    return op
+
+
+def clearFFOutputParserCache():
+    _parserCache.clear()
 
 class PDDLPatcher:
     def __init__(self, pddlFile):
@@ -8,15 +39,16 @@ class PDDLPatcher:
     def patchWithFFOutput(self, ffOutputFile, stateNum):
         print "Patching with state {0} from {1}.\n".format\
             (stateNum, ffOutputFile)
-        op = OutputParser(ffOutputFile)
-        propSet = op.getPropSet()
+        op = getFFOutputParser(ffOutputFile)
 
-        deltaState = op.getStateByIndex(stateNum)
+        ## copy: the parsed state is shared with later calls
+        deltaState = State()
+        deltaState.patch(op.getStateByIndex(stateNum))
 
         #deltaState.printState()
         ##Compile away FF's CWA: figure out the set of props
         ## it has CWA with, include those not in true set as false
-        deltaState.makeCWAExplicit(propSet)
+        deltaState.makeCWAExplicit(op.propSet)
         self.initFileMgr.patchInitState(deltaState)
 
     def patchWithFDOutput(self, fdOutStr, stateNum, planCount):
@@ -40,7 +72,7 @@ class PDDLPatcher:
         print inputFromContinuous
         print
         deltaState = State()
-        z=map(lambda x: deltaState.addProposition(x), inputFromContinuous)
+        deltaState.addPropositions(inputFromContinuous)
         self.initFileMgr.patchInitState(deltaState)
 
 
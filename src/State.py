@@ -1,14 +1,18 @@
 import re, pdb
 
+notHyphenPattern = re.compile("\(not-", re.IGNORECASE)
+notSpacePattern = re.compile("\(not ", re.IGNORECASE)
+whitespacePattern = re.compile("\s+")
+
 class State:
     def __init__(self):
         self.__trueSet = set();
         self.__falseSet = set();
 
     def addProposition(self, propStr):
-        r1 = re.compile("\(not-", re.IGNORECASE)
-        r2 = re.compile("\(not ", re.IGNORECASE)
-        propStr = re.sub("\s+", " ", propStr).strip()
+        r1 = notHyphenPattern
+        r2 = notSpacePattern
+        propStr = whitespacePattern.sub(" ", propStr).strip()
         
         if (r1.match(propStr) != None):
             self.addFalse(r1.sub("(", propStr.strip()))
@@ -18,6 +22,11 @@ class State:
             self.addFalse(toAdd)
         else:
             self.addTrue(propStr.strip())
+
+    def addPropositions(self, propStrs):
+        add = self.addProposition
+        for propStr in propStrs:
+            add(propStr)
        
             
     def addTrue(self, propStr):
@@ -6,10 +6,28 @@ import numpy as np
 import reachability
 import utils
 import sys
+from contextlib import contextmanager
 
 class GraspingPoseError(Exception):
     pass
 
+@contextmanager
+def _temporarily_removed(env, body):
+    """Removes body from env for the duration of the with block, adding it
+    back even if the block raises."""
+    env.Remove(body)
+    try:
+        yield
+    finally:
+        env.AddKinBody(body)
+
+graspingPoseCacheSize = 16
+_grasping_pose_cache = {}
+
+def clear_grasping_pose_cache():
+    """Forgets all the results memoized by get_collision_free_grasping_pose."""
+    _grasping_pose_cache.clear()
+
 def generate_manip_above_surface(obj, num_poses = 20):
     
     gripper_angle = (np.pi, 0., 0) #just got this from trial and test
@@ -112,7 +130,20 @@ def generate_grasping_pose(robot,
     openravepy.raveLogInfo("Number of valid grasps: %d" % len(validgrasps))
     import pdb
     #pdb.set_trace()
-    return [gmodel.getGlobalGraspTransform(grasp) for grasp in validgrasps]
+    if len(validgrasps) == 0:
+        return []
+    
+    # same as gmodel.getGlobalGraspTransform(grasp) for every grasp, but with
+    # all the local grasp transforms stacked and multiplied in one go
+    validgrasps = np.asarray(validgrasps)
+    num_grasps = len(validgrasps)
+    trans = validgrasps[:, gmodel.graspindices['igrasptrans']]
+    local_transforms = np.zeros((num_grasps, 4, 4))
+    local_transforms[:, :3, :] = trans.reshape(num_grasps, 4, 3).transpose(0, 2, 1)
+    local_transforms[:, 3, 3] = 1.
+    global_transforms = np.einsum('ij,njk->nik', obj_to_grasp.GetTransform(),
+                                  local_transforms)
+    return list(global_transforms)
 
 def generate_random_pos(robot, obj_to_grasp = None):
     """Generate a random position for the robot within the boundaries of the 
@@ -175,7 +206,6 @@ def check_reachable(good_bodies, env, obj_to_grasp, manip, grasping_poses, only_
     v[pr2.GetJoint('r_gripper_l_finger_joint').GetDOFIndex()]=0.54
     pr2.SetDOFValues(v)
 
-    env.Remove(obj_to_grasp)
     if len(grasping_poses) == 0:
         return None, []
     if only_reachable:
@@ -186,33 +216,32 @@ def check_reachable(good_bodies, env, obj_to_grasp, manip, grasping_poses, only_
         options = (openravepy.IkFilterOptions.CheckEnvCollisions)
 
 
-    for pose in grasping_poses:
-        sol = manip.FindIKSolution(pose, options)
-
-        if sol is None:
-            continue
-
-        # if sol has collisions with unmovable objects, continue
-        pr2.SetDOFValues(sol, pr2.GetActiveManipulator().GetArmIndices());                    
-        collisions =  utils.get_all_collisions(pr2, env)
-        # unmovable = lambda b: not (b.GetName().startswith("random") or\
-        #                            b.GetName().startswith('object'))
-        # unmovable_bodies = filter(unmovable, collisions)
-        # if len(unmovable_bodies) == 0:
-        #     pass
-        #     #continue
-
-        bad_body_exists = False
-        for body in collisions:
-            if body not in good_bodies:
-                bad_body_exists = True
-                break
-        if bad_body_exists:
-            continue
-
-        env.AddKinBody(obj_to_grasp)
-        return sol, collisions
-    env.AddKinBody(obj_to_grasp)
+    good_bodies = set(good_bodies)
+    arm_indices = pr2.GetActiveManipulator().GetArmIndices()
+    find_ik = manip.FindIKSolution
+    set_dof_values = pr2.SetDOFValues
+    get_all_collisions = utils.get_all_collisions
+    with _temporarily_removed(env, obj_to_grasp):
+        for pose in grasping_poses:
+            sol = find_ik(pose, options)
+
+            if sol is None:
+                continue
+
+            # if sol has collisions with unmovable objects, continue
+            set_dof_values(sol, arm_indices);                    
+            collisions =  get_all_collisions(pr2, env)
+            # unmovable = lambda b: not (b.GetName().startswith("random") or\
+            #                            b.GetName().startswith('object'))
+            # unmovable_bodies = filter(unmovable, collisions)
+            # if len(unmovable_bodies) == 0:
+            #     pass
+            #     #continue
+
+            if not collisions.issubset(good_bodies):
+                continue
+
+            return sol, collisions
     return None, []
 
 def get_collision_free_grasping_pose(good_bodies, robot,
@@ -235,12 +264,30 @@ def get_collision_free_grasping_pose(good_bodies, robot,
     the active manipulator angles and the torso joint angle from where the robot
     can grasp an object.
     
+    Successful results are memoized per object, set of good bodies and
+    scene signature, so asking again in an unchanged scene is free. Failures
+    are not memoized, since the search is randomized and a retry may succeed.
+    Call clear_grasping_pose_cache to force a new search.
+
     Raises GraspingPoseError if no valid solution is found.
     """
     
     env = robot.GetEnv()
     robot_pose = robot.GetTransform()
     torso_angle = robot.GetJoint("torso_lift_joint").GetValues()[0]
+
+    # the scene signature leaves out the robot's joints: the search below
+    # moves the arm and opens the gripper itself. The torso does matter.
+    cache_key = (object_to_grasp.GetName(),
+                 frozenset(b.GetName() for b in good_bodies),
+                 max_trials,
+                 use_general_grasps,
+                 torso_angle,
+                 utils.get_scene_signature(env))
+    cached_value = _grasping_pose_cache.get(cache_key, None)
+    if cached_value is not None:
+        return cached_value
+
     manip = robot.GetActiveManipulator()
     
     ikmodel = openravepy.databases.inversekinematics.InverseKinematicsModel(
@@ -282,6 +329,9 @@ def get_collision_free_grasping_pose(good_bodies, robot,
         e = GraspingPoseError("No collision free grasping pose found within %d steps" % max_trials)    
         raise e
     else:
+        if len(_grasping_pose_cache) >= graspingPoseCacheSize:
+            _grasping_pose_cache.clear()
+        _grasping_pose_cache[cache_key] = (robot_pose, sol, torso_angle)
         return (robot_pose, sol, torso_angle)
 
 def get_collision_free_ik_pose(good_bodies, robot, object_to_grasp,
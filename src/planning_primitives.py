@@ -77,6 +77,10 @@ class Executor(object):
             robot,iktype=openravepy.IkParameterization.Type.Transform6D)    
         if not ikmodel.load():
             ikmodel.autogenerate()
+        
+        # the right arm stays the active manipulator from here on
+        self.arm_indices = robot.GetActiveManipulator().GetArmIndices()
+        self.torso_joint_index = robot.GetJointIndex('torso_lift_joint')
 
     def getGoodBodies(self):
         if not doJointInterpretation:
@@ -97,6 +101,7 @@ class Executor(object):
     def clear_gp_cache(self):
         self.grasping_locations_cache = {}
         self.objSequenceInPlan = []
+        generate_reaching_poses.clear_grasping_pose_cache()
 
     def pause(self, msg = None):
         if self.viewMode:
@@ -208,9 +213,9 @@ class Executor(object):
             
             self.pause("Moving arm")
             self.robot.SetDOFValues([torso_angle],
-                                    [self.robot.GetJointIndex('torso_lift_joint')])        
+                                    [self.torso_joint_index])        
             self.robot.SetDOFValues(sol,
-                                    self.robot.GetActiveManipulator().GetArmIndices())
+                                    self.arm_indices)
 
         self.robot.Grab(obj)
     
@@ -294,9 +299,9 @@ class Executor(object):
             
             self.pause("Moving arm")
             self.robot.SetDOFValues([torso_angle],
-                                    [self.robot.GetJointIndex('torso_lift_joint')])
+                                    [self.torso_joint_index])
             self.robot.SetDOFValues(sol,
-                                    self.robot.GetActiveManipulator().GetArmIndices())
+                                    self.arm_indices)
 
         self.robot.Release(obj)
         
@@ -379,9 +384,9 @@ class Executor(object):
         
         self.pause("Arm/Torso in position")
         self.robot.SetDOFValues([torso_angle],
-                                [self.robot.GetJointIndex('torso_lift_joint')])
+                                [self.torso_joint_index])
         self.robot.SetDOFValues(sol,
-                                self.robot.GetActiveManipulator().GetArmIndices())
+                                self.arm_indices)
         print "Releasing object"
         self.robot.Release(obj)
         self.tray_stack.append(obj)
@@ -33,11 +33,14 @@ def get_occluding_objects_names(good_bodies, robot,
                                              return_pose, body_filter)
     openravepy.raveLogInfo("Bodies: %s" % obstacles_bodies)  
     obstacles = set()
+    obj_name = obj.GetName()
     for l in obstacles_bodies:
         t = []
         for b in l:
-            if body_filter(b) and (b.GetName() != obj.GetName()):
-                t.append(str(b.GetName()))
+            if body_filter(b):
+                name = b.GetName()
+                if name != obj_name:
+                    t.append(str(name))
         t = tuple(t)
         if len(t) > 0:
             obstacles.add(t)
@@ -425,6 +425,24 @@ def get_all_collisions(obj, env):
     
     return collisions
 
+def get_scene_signature(env):
+    """Returns a hashable snapshot of the environment: the name and transform
+    of every body, and the joint values of every body that is not a robot.
+    Robot joints are left out so that moving an arm or the gripper does not
+    change the signature; callers that depend on some joint add it to their
+    own key. Two calls return equal values only if nothing else in the scene
+    has moved in between."""
+    signature = []
+    for body in env.GetBodies():
+        if body.IsRobot():
+            dof_values = ()
+        else:
+            dof_values = tuple(body.GetDOFValues())
+        signature.append((body.GetName(),
+                          tuple(body.GetTransform().flat),
+                          dof_values))
+    return tuple(signature)
+
 
 def setGoalObject(objName, pddlFile):
     pddlStr = open(pddlFile).read()
@@ -436,9 +454,7 @@ def setGoalObject(objName, pddlFile):
     return outf
 
 def find_nearest_box(obj, box_msgs):
-    obj_x = obj.GetTransform()[0][3]
-    obj_y = obj.GetTransform()[1][3]
-    obj_z = obj.GetTransform()[2][3]
+    obj_x, obj_y, obj_z = obj.GetTransform()[:3, 3]
 
     closest_dist = float("inf")
     best_box_msg = None